@@ -1,26 +1,249 @@
-from sqlalchemy import create_engine, func, desc, and_
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, func, desc, and_, select, update, bindparam, inspect, case
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, selectinload, sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlalchemy.schema import CreateIndex
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+import threading
+import time
 from .models import Base, Product, Customer, Sale, Supply, Employee, InventoryCheck, ProductCategory
-import pandas as pd
 
 class DatabaseManager:
     """Менеджер базы данных магазина"""
     
+    # Сколько товаров/клиентов держать в кэше поиска по ID
+    CACHE_SIZE = 256
+    # Сколько секунд считать сумму продаж за период актуальной
+    SALES_SUM_TTL = 5.0
+    
     def __init__(self, db_url="sqlite:///store.db"):
-        self.engine = create_engine(db_url)
-        self.Session = sessionmaker(bind=self.engine)
+        self.engine = create_engine(db_url, **self._engine_options(db_url))
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", self._set_sqlite_pragmas)
+        # Одна сессия на поток; атрибуты не сбрасываются после commit,
+        # поэтому возвращаемые объекты читаются без повторного SELECT
+        self.Session = scoped_session(
+            sessionmaker(bind=self.engine, expire_on_commit=False)
+        )
+        # LRU-кэши get_product_by_id / get_customer_by_id,
+        # сбрасываются при любом изменении записи
+        self._product_cache = OrderedDict()
+        self._customer_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Запросы горячих путей строятся один раз, а не при каждом вызове
+        self._get_product_stmt = select(Product).where(
+            Product.id == bindparam('product_id')
+        )
+        self._products_light_stmt = select(
+            Product.id,
+            Product.name,
+            Product.category,
+            Product.price,
+            Product.quantity,
+            Product.min_stock
+        )
+        self._product_light_stmt = self._products_light_stmt.where(
+            Product.id == bindparam('product_id')
+        )
+        self._get_customer_stmt = select(Customer).where(
+            Customer.id == bindparam('customer_id')
+        )
+        self._sales_sum_stmt = select(func.sum(Sale.total))
+        self._sales_sum_range_stmt = self._sales_sum_stmt.where(
+            and_(
+                Sale.date >= bindparam('start_date'),
+                Sale.date <= bindparam('end_date')
+            )
+        )
+        # Списание и приход товара; с RETURNING цена и название товара
+        # приходят вместе с UPDATE, без отдельного SELECT
+        self._sell_stmt = update(Product).where(
+            Product.id == bindparam('product_id'),
+            Product.quantity >= bindparam('sold')
+        ).values(
+            quantity=Product.quantity - bindparam('sold')
+        ).execution_options(synchronize_session=False)
+        self._receive_stmt = update(Product).where(
+            Product.id == bindparam('product_id')
+        ).values(
+            quantity=Product.quantity + bindparam('received')
+        ).execution_options(synchronize_session=False)
+        self._update_returning = self.engine.dialect.update_returning
+        if self._update_returning:
+            self._sell_stmt = self._sell_stmt.returning(Product.price, Product.name)
+            self._receive_returning_stmt = self._receive_stmt.returning(Product.name)
+        self._product_sale_info_stmt = select(Product.price, Product.name).where(
+            Product.id == bindparam('product_id')
+        )
+        self._customer_discount_stmt = select(Customer.name, Customer.discount).where(
+            Customer.id == bindparam('customer_id')
+        )
+        self._related_counts_stmt = select(
+            select(func.count(Sale.id)).where(
+                Sale.product_id == bindparam('product_id')
+            ).scalar_subquery().label('sales'),
+            select(func.count(Supply.id)).where(
+                Supply.product_id == bindparam('product_id')
+            ).scalar_subquery().label('supplies'),
+            select(func.count(InventoryCheck.id)).where(
+                InventoryCheck.product_id == bindparam('product_id')
+            ).scalar_subquery().label('inventory_checks')
+        )
+        # (start_date, end_date) -> (сумма, время расчета по time.monotonic)
+        self._sales_sum_cache = {}
         self.create_tables()
     
+    @staticmethod
+    def _engine_options(db_url):
+        """Параметры пула соединений для движка"""
+        url = make_url(db_url)
+        if url.get_backend_name() != "sqlite":
+            return {}
+        
+        options = {"connect_args": {"check_same_thread": False}}
+        if url.database in (None, "", ":memory:"):
+            # Базу в памяти видит только одно соединение
+            options["poolclass"] = StaticPool
+        else:
+            # Держим соединения открытыми, чтобы не переподключаться
+            # и не выполнять PRAGMA на каждый запрос
+            options.update(
+                poolclass=QueuePool,
+                pool_size=5,
+                max_overflow=10,
+                pool_use_lifo=True
+            )
+        return options
+    
+    @staticmethod
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Настроить SQLite для нового соединения"""
+        cursor = dbapi_connection.cursor()
+        # WAL и synchronous=NORMAL: один fsync на контрольную точку, а не на commit
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 МБ
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 МБ
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+    
+    def _cache_get(self, cache, key):
+        """Взять объект из LRU-кэша"""
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+    
+    def _cache_put(self, cache, key, value):
+        """Положить объект в LRU-кэш, вытеснив самый старый"""
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            if len(cache) > self.CACHE_SIZE:
+                cache.popitem(last=False)
+    
+    def _cache_invalidate(self, cache, *keys):
+        """Удалить записи из LRU-кэша"""
+        with self._cache_lock:
+            for key in keys:
+                cache.pop(key, None)
+    
+    @contextmanager
+    def _invalidate_after(self, products=(), customers=(), sales_sum=False):
+        """Сбросить записи кэшей при выходе из блока, то есть после commit
+        
+        Сброс до commit не помогает: другой поток успел бы положить
+        в кэш строку в состоянии до записи.
+        """
+        try:
+            yield
+        finally:
+            self._cache_invalidate(self._product_cache, *products)
+            self._cache_invalidate(self._customer_cache, *customers)
+            if sales_sum:
+                with self._cache_lock:
+                    self._sales_sum_cache.clear()
+    
+    @staticmethod
+    def _snapshot(obj):
+        """Значения столбцов объекта для хранения в кэше"""
+        return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+    
+    def _stream(self, build_query, batch_size):
+        """Отдавать результат запроса порциями по batch_size строк
+        
+        Используется отдельная сессия, а не общая для потока: иначе
+        любой вызов менеджера во время обхода закрыл бы курсор.
+        """
+        with self.Session.session_factory() as session:
+            yield from build_query(session).yield_per(batch_size)
+    
     def create_tables(self):
         """Создать таблицы в базе данных"""
         Base.metadata.create_all(self.engine)
+        with self.engine.begin() as connection:
+            added = self._add_missing_columns(connection)
+            self._fill_denormalized_names(connection, added)
+            # create_all не добавляет индексы в уже существующие таблицы;
+            # IF NOT EXISTS, потому что индексы по выражению не отражаются
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    connection.execute(CreateIndex(index, if_not_exists=True))
+        if self.engine.dialect.name == "sqlite":
+            # Обновляет статистику планировщика, только если она устарела
+            with self.engine.connect() as connection:
+                connection.exec_driver_sql("PRAGMA optimize")
+    
+    @staticmethod
+    def _add_missing_columns(connection):
+        """Добавить в существующие таблицы столбцы, появившиеся в моделях
+        
+        Возвращает множество добавленных пар (таблица, столбец).
+        """
+        inspector = inspect(connection)
+        preparer = connection.dialect.identifier_preparer
+        added = set()
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} "
+                    f"{column.type.compile(dialect=connection.dialect)}"
+                )
+                added.add((table.name, column.name))
+        return added
+    
+    @staticmethod
+    def _fill_denormalized_names(connection, added):
+        """Заполнить названия в старых продажах и поставках"""
+        product_name = select(Product.name).where(Product.id == Sale.product_id)
+        customer_name = select(Customer.name).where(Customer.id == Sale.customer_id)
+        supply_product_name = select(Product.name).where(Product.id == Supply.product_id)
+        if ('sales', 'product_name') in added:
+            connection.execute(update(Sale).values(
+                product_name=product_name.scalar_subquery()
+            ))
+        if ('sales', 'customer_name') in added:
+            connection.execute(update(Sale).where(Sale.customer_id.is_not(None)).values(
+                customer_name=customer_name.scalar_subquery()
+            ))
+        if ('supplies', 'product_name') in added:
+            connection.execute(update(Supply).values(
+                product_name=supply_product_name.scalar_subquery()
+            ))
     
     def add_product(self, name, category, price, quantity=0, min_stock=10, 
                    barcode=None, description=None):
         """Добавить товар"""
-        session = self.Session()
-        try:
+        with self.Session() as session, session.begin():
             product = Product(
                 name=name,
                 category=category,
@@ -31,57 +254,81 @@ class DatabaseManager:
                 description=description
             )
             session.add(product)
-            session.commit()
             return product
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
     def get_all_products(self):
         """Получить все товары"""
-        session = self.Session()
-        try:
+        with self.Session() as session:
             return session.query(Product).all()
-        finally:
-            session.close()
+    
+    def get_all_products_light(self):
+        """Получить все товары для отображения
+        
+        Возвращает строки Row (только чтение) с полями id, name, category,
+        price, quantity, min_stock - без создания ORM-объектов.
+        """
+        with self.Session() as session:
+            return session.execute(self._products_light_stmt).all()
+    
+    def get_product_light(self, product_id):
+        """Получить один товар в том же виде, что get_all_products_light"""
+        with self.Session() as session:
+            return session.execute(
+                self._product_light_stmt, {'product_id': product_id}
+            ).first()
+    
+    def iter_products(self, batch_size=1000):
+        """Перебрать все товары, не загружая таблицу целиком"""
+        return self._stream(lambda session: session.query(Product), batch_size)
     
     def get_product_by_id(self, product_id):
         """Получить товар по ID"""
-        session = self.Session()
-        try:
-            return session.query(Product).get(product_id)
-        finally:
-            session.close()
+        # В кэше лежит копия значений, и каждый вызов получает свой объект:
+        # изменения возвращенного товара не попадают в кэш
+        values = self._cache_get(self._product_cache, product_id)
+        if values is not None:
+            return Product(**values)
+        
+        with self.Session() as session:
+            product = session.execute(
+                self._get_product_stmt, {'product_id': product_id}
+            ).scalar_one_or_none()
+        if product is not None:
+            self._cache_put(self._product_cache, product_id, self._snapshot(product))
+        return product
     
     def update_product_quantity(self, product_id, quantity_change):
         """Обновить количество товара"""
-        session = self.Session()
-        try:
+        with self._invalidate_after(products=[product_id]), \
+                self.Session() as session, session.begin():
             product = session.query(Product).get(product_id)
             if product:
                 product.quantity += quantity_change
-                session.commit()
                 return product
             return None
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
     def update_product(self, product_id, name=None, category=None, price=None, 
                       quantity=None, min_stock=None, barcode=None, description=None):
         """Обновить товар"""
-        session = self.Session()
-        try:
+        with self._invalidate_after(products=[product_id]), \
+                self.Session() as session, session.begin():
             product = session.query(Product).get(product_id)
             if not product:
                 return None
             
-            if name is not None:
+            if name is not None and name != product.name:
                 product.name = name
+                # Переименование переносится в сохраненные копии названия
+                session.execute(
+                    update(Sale).where(Sale.product_id == product_id).values(
+                        product_name=name
+                    ).execution_options(synchronize_session=False)
+                )
+                session.execute(
+                    update(Supply).where(Supply.product_id == product_id).values(
+                        product_name=name
+                    ).execution_options(synchronize_session=False)
+                )
             if category is not None:
                 product.category = category
             if price is not None:
@@ -95,78 +342,54 @@ class DatabaseManager:
             if description is not None:
                 product.description = description
             
-            session.commit()
             return product
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
     def get_product_related_counts(self, product_id):
         """Получить количество связанных записей для товара"""
-        session = self.Session()
-        try:
-            sales_count = session.query(Sale).filter(Sale.product_id == product_id).count()
-            supplies_count = session.query(Supply).filter(Supply.product_id == product_id).count()
-            inventory_checks_count = session.query(InventoryCheck).filter(
-                InventoryCheck.product_id == product_id
-            ).count()
-            return {
-                'sales': sales_count,
-                'supplies': supplies_count,
-                'inventory_checks': inventory_checks_count
-            }
-        finally:
-            session.close()
+        with self.Session() as session:
+            # Все три счетчика одним SELECT со скалярными подзапросами
+            row = session.execute(
+                self._related_counts_stmt, {'product_id': product_id}
+            ).one()
+            return dict(row._mapping)
     
     def delete_product(self, product_id):
         """Удалить товар"""
-        session = self.Session()
-        try:
-            product = session.query(Product).get(product_id)
-            if not product:
-                return False
+        with self._invalidate_after(products=[product_id], sales_sum=True), \
+                self.Session() as session, session.begin():
+            # Сумма покупок клиентов считается по продажам, поэтому
+            # покупатели товара уходят из кэша вместе с его продажами
+            customer_ids = session.execute(
+                select(Sale.customer_id).where(
+                    Sale.product_id == product_id,
+                    Sale.customer_id.is_not(None)
+                ).distinct()
+            ).scalars().all()
             
             # Удаляем все связанные записи перед удалением товара
-            
-            # Удаляем все продажи, связанные с товаром
-            sales = session.query(Sale).filter(Sale.product_id == product_id).all()
-            for sale in sales:
-                session.delete(sale)
-            
-            # Удаляем все поставки, связанные с товаром
-            supplies = session.query(Supply).filter(Supply.product_id == product_id).all()
-            for supply in supplies:
-                session.delete(supply)
-            
-            # Удаляем все проверки инвентаря, связанные с товаром
-            inventory_checks = session.query(InventoryCheck).filter(
+            # одним DELETE на таблицу, без загрузки объектов в сессию
+            session.query(Sale).filter(
+                Sale.product_id == product_id
+            ).delete(synchronize_session=False)
+            session.query(Supply).filter(
+                Supply.product_id == product_id
+            ).delete(synchronize_session=False)
+            session.query(InventoryCheck).filter(
                 InventoryCheck.product_id == product_id
-            ).all()
-            for check in inventory_checks:
-                session.delete(check)
+            ).delete(synchronize_session=False)
             
-            # Теперь можно безопасно удалить товар
-            session.delete(product)
-            session.commit()
-            return True
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+            # Теперь можно безопасно удалить товар; если его не было,
+            # связанных записей тоже нет и удалять было нечего
+            deleted = session.query(Product).filter(
+                Product.id == product_id
+            ).delete(synchronize_session=False)
+        self._cache_invalidate(self._customer_cache, *customer_ids)
+        return deleted > 0
     
     def add_customer(self, name, phone, email, discount=0.0):
         """Добавить клиента"""
-        session = self.Session()
-        try:
-            # пустые строки в None
-            if phone and isinstance(phone, str):
-                phone = phone.strip() or None
-            if email and isinstance(email, str):
-                email = email.strip() or None
-            
+        with self.Session() as session, session.begin():
+            # Пробелы и пустые строки в phone/email обрабатывает TrimmedString
             customer = Customer(
                 name=name,
                 phone=phone,
@@ -174,45 +397,81 @@ class DatabaseManager:
                 discount=discount
             )
             session.add(customer)
-            session.commit()
+            session.flush()
+            # У нового клиента продаж нет: сумма известна без запроса
+            set_committed_value(customer, 'total_purchases', 0.0)
             return customer
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
     def get_all_customers(self):
         """Получить всех клиентов"""
-        session = self.Session()
-        try:
+        with self.Session() as session:
             return session.query(Customer).all()
-        finally:
-            session.close()
+    
+    def get_all_customers_light(self):
+        """Получить всех клиентов для отображения
+        
+        Возвращает строки Row (только чтение) с полями id, name, phone,
+        email, discount - без создания ORM-объектов.
+        """
+        with self.Session() as session:
+            return session.execute(
+                select(
+                    Customer.id,
+                    Customer.name,
+                    Customer.phone,
+                    Customer.email,
+                    Customer.discount
+                )
+            ).all()
+    
+    def iter_customers(self, batch_size=1000):
+        """Перебрать всех клиентов, не загружая таблицу целиком"""
+        return self._stream(lambda session: session.query(Customer), batch_size)
     
     def get_customer_by_id(self, customer_id):
         """Получить клиента по ID"""
-        session = self.Session()
-        try:
-            return session.query(Customer).get(customer_id)
-        finally:
-            session.close()
+        values = self._cache_get(self._customer_cache, customer_id)
+        if values is not None:
+            return Customer(**values)
+        
+        with self.Session() as session:
+            customer = session.execute(
+                self._get_customer_stmt, {'customer_id': customer_id}
+            ).scalar_one_or_none()
+        if customer is not None:
+            self._cache_put(self._customer_cache, customer_id, self._snapshot(customer))
+        return customer
     
     def record_sale(self, product_id, quantity, customer_id=None):
         """Записать продажу"""
-        session = self.Session()
-        try:
-            product = session.query(Product).get(product_id)
-            if not product or product.quantity < quantity:
-                return None
+        with self._invalidate_after(products=[product_id], customers=[customer_id],
+                                    sales_sum=True), \
+                self.Session() as session, session.begin():
+            # Списываем товар одним UPDATE: наличие проверяет сама база,
+            # поэтому параллельные продажи не уведут остаток в минус
+            params = {'product_id': product_id, 'sold': quantity}
+            result = session.execute(self._sell_stmt, params)
+            if self._update_returning:
+                row = result.first()
+                if row is None:
+                    return None
+                price, product_name = row
+            else:
+                if result.rowcount == 0:
+                    return None
+                price, product_name = session.execute(
+                    self._product_sale_info_stmt, params
+                ).one()
             
             # Получаем клиента если указан
             customer = None
             if customer_id:
-                customer = session.query(Customer).get(customer_id)
+                customer = session.execute(
+                    self._customer_discount_stmt, {'customer_id': customer_id}
+                ).first()
             
             # Рассчитываем итоговую сумму
-            total = product.price * quantity
+            total = price * quantity
             if customer and customer.discount > 0:
                 total = total * (1 - customer.discount / 100)
             
@@ -221,135 +480,371 @@ class DatabaseManager:
                 product_id=product_id,
                 customer_id=customer_id,
                 quantity=quantity,
-                price=product.price,
+                price=price,
                 total=total,
-                date=datetime.now()
+                product_name=product_name,
+                customer_name=customer.name if customer else None
             )
             
-            # Обновляем количество товара
-            product.quantity -= quantity
-            
-            # Обновляем статистику клиента
-            if customer:
-                customer.total_purchases += total
-            
             session.add(sale)
-            session.commit()
-           
-            session.refresh(sale)  
-            session.expunge(sale)  
             return sale
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
-    def get_sales_by_date_range(self, start_date, end_date):
-        """Получить продажи за период"""
-        session = self.Session()
-        try:
-            sales = session.query(Sale).filter(
+    def record_sales(self, items):
+        """Записать несколько продаж одной транзакцией
+        
+        items - список кортежей (product_id, quantity, customer_id).
+        Возвращает количество записанных продаж или None, если какого-то
+        товара нет или его не хватает (тогда ничего не записывается).
+        """
+        product_ids = {product_id for product_id, _, _ in items}
+        customer_ids = {customer_id for _, _, customer_id in items if customer_id}
+        
+        # Сколько списать по каждому товару
+        sold = {}
+        for product_id, quantity, _ in items:
+            sold[product_id] = sold.get(product_id, 0) + quantity
+        
+        with self._invalidate_after(products=product_ids, customers=customer_ids,
+                                    sales_sum=True), \
+                self.Session() as session, session.begin():
+            # Списываем товар тем же условным UPDATE, что и record_sale:
+            # наличие проверяет сама база, а не прочитанный ранее остаток
+            for product_id, quantity in sold.items():
+                result = session.execute(
+                    self._sell_stmt, {'product_id': product_id, 'sold': quantity}
+                )
+                if self._update_returning:
+                    written = result.first() is not None
+                else:
+                    written = result.rowcount > 0
+                if not written:
+                    session.rollback()
+                    return None
+            
+            # Цены и названия товаров и клиенты - одним IN-запросом на таблицу
+            products = {
+                product.id: product
+                for product in session.execute(
+                    select(Product.id, Product.price, Product.name).where(
+                        Product.id.in_(product_ids)
+                    )
+                )
+            }
+            customers = {}
+            if customer_ids:
+                customers = {
+                    customer.id: customer
+                    for customer in session.execute(
+                        select(Customer.id, Customer.name, Customer.discount).where(
+                            Customer.id.in_(customer_ids)
+                        )
+                    )
+                }
+            
+            now = datetime.now()
+            sales = []
+            for product_id, quantity, customer_id in items:
+                product = products[product_id]
+                customer = customers.get(customer_id)
+                total = product.price * quantity
+                if customer and customer.discount > 0:
+                    total = total * (1 - customer.discount / 100)
+                
+                sales.append({
+                    'product_id': product_id,
+                    'customer_id': customer_id,
+                    'quantity': quantity,
+                    'price': product.price,
+                    'total': total,
+                    'date': now,
+                    'product_name': product.name,
+                    'customer_name': customer.name if customer else None
+                })
+            
+            session.bulk_insert_mappings(Sale, sales)
+            return len(sales)
+    
+    def get_sales_by_date_range(self, start_date, end_date, limit=None, offset=0,
+                                with_relations=True):
+        """Получить продажи за период, от новых к старым
+        
+        limit/offset позволяют загружать период постранично.
+        with_relations=False не загружает товар и клиента: для показа
+        хватает названий, сохраненных в самой продаже.
+        """
+        with self.Session() as session:
+            query = session.query(Sale)
+            if with_relations:
+                # Товары и клиенты подгружаются двумя запросами IN (...),
+                # а не отдельным запросом на каждую продажу
+                query = query.options(
+                    selectinload(Sale.product),
+                    selectinload(Sale.customer)
+                )
+            sales = query.filter(
                 and_(
                     Sale.date >= start_date,
                     Sale.date <= end_date
                 )
-            ).all()
-            # Отсоединяем все объекты от сессии
-            for sale in sales:
-                session.expunge(sale)
+            ).order_by(
+                desc(Sale.date), desc(Sale.id)
+            ).limit(limit).offset(offset).all()
+            # Объекты отсоединяются все сразу при закрытии сессии
             return sales
-        finally:
-            session.close()
+    
+    def count_sales_by_date_range(self, start_date, end_date):
+        """Получить количество продаж за период"""
+        with self.Session() as session:
+            return session.query(func.count(Sale.id)).filter(
+                and_(
+                    Sale.date >= start_date,
+                    Sale.date <= end_date
+                )
+            ).scalar()
+    
+    def iter_sales_by_date_range(self, start_date, end_date, batch_size=1000):
+        """Перебрать продажи за период, не загружая их все в память"""
+        return self._stream(
+            lambda session: session.query(Sale).filter(
+                and_(
+                    Sale.date >= start_date,
+                    Sale.date <= end_date
+                )
+            ),
+            batch_size
+        )
+    
+    def get_sales_df(self, start_date, end_date):
+        """Получить продажи за период в виде DataFrame"""
+        # pandas импортируется здесь, чтобы не замедлять запуск приложения
+        import pandas as pd
+        
+        query = select(Sale.__table__).where(
+            and_(
+                Sale.date >= start_date,
+                Sale.date <= end_date
+            )
+        )
+        # Денежные столбцы остаются float64: во float32 суммы теряют копейки
+        return pd.read_sql_query(
+            query,
+            self.engine,
+            parse_dates=['date'],
+            dtype={
+                'id': 'int64',
+                'product_id': 'int32',
+                'customer_id': 'Int32',
+                'quantity': 'int32',
+                'price': 'float64',
+                'total': 'float64'
+            }
+        )
     
     def add_supply(self, supplier, product_id, quantity, cost):
         """Добавить поставку"""
-        session = self.Session()
-        try:
+        with self._invalidate_after(products=[product_id]), \
+                self.Session() as session, session.begin():
+            # Обновляем количество товара
+            params = {'product_id': product_id, 'received': quantity}
+            if self._update_returning:
+                product_name = session.execute(
+                    self._receive_returning_stmt, params
+                ).scalar_one_or_none()
+            else:
+                session.execute(self._receive_stmt, params)
+                product_name = session.execute(
+                    select(Product.name).where(Product.id == product_id)
+                ).scalar_one_or_none()
+            
             supply = Supply(
                 supplier=supplier,
                 product_id=product_id,
                 quantity=quantity,
                 cost=cost,
-                date=datetime.now()
+                product_name=product_name
             )
             
-            # Обновляем количество товара
-            product = session.query(Product).get(product_id)
-            if product:
-                product.quantity += quantity
-            
             session.add(supply)
-            session.commit()
-            # Отсоединяем объект от сессии перед возвратом
-            session.refresh(supply)  # Загружаем все атрибуты
-            session.expunge(supply)  # Отсоединяем от сессии
             return supply
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
-    def get_all_supplies(self):
-        """Получить все поставки"""
-        session = self.Session()
-        try:
-            supplies = session.query(Supply).order_by(desc(Supply.date)).all()
-            # Отсоединяем все объекты от сессии
-            for supply in supplies:
-                session.expunge(supply)
-            return supplies
-        finally:
-            session.close()
+    def add_supplies(self, rows):
+        """Добавить несколько поставок одной транзакцией
+        
+        rows - список словарей с ключами supplier, product_id, quantity, cost.
+        Возвращает количество добавленных поставок.
+        """
+        if not rows:
+            return 0
+        
+        # Приход по каждому товару складываем заранее, чтобы обновить
+        # остатки одним executemany, по строке на товар
+        received = {}
+        for row in rows:
+            received[row['product_id']] = received.get(row['product_id'], 0) + row['quantity']
+        
+        with self._invalidate_after(products=received), \
+                self.engine.begin() as connection:
+            names = dict(connection.execute(
+                select(Product.id, Product.name).where(Product.id.in_(received))
+            ).all())
+            rows = [
+                {**row, 'product_name': names.get(row['product_id'])}
+                for row in rows
+            ]
+            connection.execute(Supply.__table__.insert(), rows)
+            connection.execute(
+                self._receive_stmt,
+                [
+                    {'product_id': product_id, 'received': quantity}
+                    for product_id, quantity in received.items()
+                ]
+            )
+        return len(rows)
+    
+    def get_all_supplies(self, limit=None, offset=0, with_relations=True):
+        """Получить все поставки, от новых к старым
+        
+        limit/offset позволяют загружать историю постранично.
+        with_relations=False не загружает товар: для показа хватает
+        названия, сохраненного в самой поставке.
+        """
+        with self.Session() as session:
+            query = session.query(Supply)
+            if with_relations:
+                query = query.options(selectinload(Supply.product))
+            # Объекты отсоединяются все сразу при закрытии сессии
+            return query.order_by(
+                desc(Supply.date), desc(Supply.id)
+            ).limit(limit).offset(offset).all()
+    
+    def count_supplies(self):
+        """Получить количество поставок"""
+        with self.Session() as session:
+            return session.query(func.count(Supply.id)).scalar()
+    
+    def iter_supplies(self, batch_size=1000):
+        """Перебрать все поставки от новых к старым, не загружая их все в память"""
+        return self._stream(
+            lambda session: session.query(Supply).order_by(desc(Supply.date)),
+            batch_size
+        )
+    
+    def bulk_inventory_check(self, rows):
+        """Записать результаты инвентаризации одной транзакцией
+        
+        rows - список словарей с ключами product_id, actual_quantity и
+        необязательными checked_by, notes. Ожидаемое количество берется
+        из текущего остатка товара. Возвращает количество записей.
+        Если какого-то товара нет, вся партия отклоняется с ValueError.
+        """
+        if not rows:
+            return 0
+        
+        product_ids = {row['product_id'] for row in rows}
+        now = datetime.now()
+        with self.engine.begin() as connection:
+            expected = dict(connection.execute(
+                select(Product.id, Product.quantity).where(
+                    Product.id.in_(product_ids)
+                )
+            ).all())
+            missing = product_ids - expected.keys()
+            if missing:
+                raise ValueError(f"Товары не найдены: {sorted(missing)}")
+            
+            checks = []
+            for row in rows:
+                expected_quantity = expected[row['product_id']]
+                checks.append({
+                    'product_id': row['product_id'],
+                    'expected_quantity': expected_quantity,
+                    'actual_quantity': row['actual_quantity'],
+                    'difference': row['actual_quantity'] - expected_quantity,
+                    'checked_by': row.get('checked_by'),
+                    'notes': row.get('notes'),
+                    'date': now
+                })
+            connection.execute(InventoryCheck.__table__.insert(), checks)
+        return len(checks)
     
     def get_low_stock_products(self):
         """Получить товары с низким запасом"""
-        session = self.Session()
-        try:
+        with self.Session() as session:
+            # Условие записано через выражение индекса ix_product_deficit
             return session.query(Product).filter(
-                Product.quantity < Product.min_stock
+                (Product.quantity - Product.min_stock) < 0
             ).all()
-        finally:
-            session.close()
+    
+    def get_stock_stats(self):
+        """Получить общий остаток и количество товаров с низким запасом"""
+        with self.Session() as session:
+            # Оба значения одним агрегатом, без загрузки строк товаров
+            total_quantity, low_stock = session.execute(
+                select(
+                    func.coalesce(func.sum(Product.quantity), 0),
+                    func.coalesce(func.sum(case(
+                        ((Product.quantity - Product.min_stock) < 0, 1),
+                        else_=0
+                    )), 0)
+                )
+            ).one()
+            return total_quantity, low_stock
     
     def get_total_sales_amount(self, start_date=None, end_date=None):
         """Получить общую сумму продаж"""
-        session = self.Session()
-        try:
-            query = session.query(func.sum(Sale.total))
-            
-            if start_date and end_date:
-                query = query.filter(
-                    and_(
-                        Sale.date >= start_date,
-                        Sale.date <= end_date
-                    )
-                )
-            
-            return query.scalar() or 0
-        finally:
-            session.close()
+        if not (start_date and end_date):
+            start_date = end_date = None
+        key = (start_date, end_date)
+        
+        with self._cache_lock:
+            cached = self._sales_sum_cache.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.SALES_SUM_TTL:
+            return cached[0]
+        
+        with self.Session() as session:
+            if start_date is None:
+                total = session.execute(self._sales_sum_stmt).scalar()
+            else:
+                total = session.execute(
+                    self._sales_sum_range_stmt,
+                    {'start_date': start_date, 'end_date': end_date}
+                ).scalar()
+        
+        total = total or 0
+        now = time.monotonic()
+        with self._cache_lock:
+            # Периоды от now() каждый раз новые: устаревшие записи убираем,
+            # чтобы словарь не рос без ограничений
+            for old_key, (_, computed_at) in list(self._sales_sum_cache.items()):
+                if now - computed_at >= self.SALES_SUM_TTL:
+                    del self._sales_sum_cache[old_key]
+            self._sales_sum_cache[key] = (total, now)
+        return total
     
     def get_best_selling_products(self, limit=10):
         """Получить самые продаваемые товары"""
-        session = self.Session()
-        try:
-            return session.query(
-                Product,
+        with self.Session() as session:
+            # Сначала агрегируем и ограничиваем продажи, затем
+            # присоединяем только limit товаров
+            top_sales = session.query(
+                Sale.product_id,
                 func.sum(Sale.quantity).label('total_sold')
-            ).join(Sale).group_by(Product.id).order_by(
+            ).group_by(Sale.product_id).order_by(
                 desc('total_sold')
-            ).limit(limit).all()
-        finally:
-            session.close()
+            ).limit(limit).subquery()
+            
+            return session.query(
+                Product,
+                top_sales.c.total_sold
+            ).join(
+                top_sales, Product.id == top_sales.c.product_id
+            ).order_by(desc(top_sales.c.total_sold)).all()
     
     def get_customer_purchases(self, customer_id):
         """Получить покупки клиента"""
-        session = self.Session()
-        try:
-            return session.query(Sale).filter(
+        with self.Session() as session:
+            return session.query(Sale).options(
+                selectinload(Sale.product)
+            ).filter(
                 Sale.customer_id == customer_id
-            ).order_by(desc(Sale.date)).all()
-        finally:
-            session.close()
\ No newline at end of file
+            ).order_by(desc(Sale.date)).all()
\ No newline at end of file
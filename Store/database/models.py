@@ -1,11 +1,26 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Index, func, select
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, column_property, validates
 from datetime import datetime
 import enum
 
 Base = declarative_base()
 
+def trim_string(value):
+    """Убрать пробелы по краям; пустая строка становится None"""
+    if isinstance(value, str):
+        value = value.strip() or None
+    return value
+
+class TrimmedString(TypeDecorator):
+    """Строка без пробелов по краям; пустая строка сохраняется как NULL"""
+    impl = String
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return trim_string(value)
+
 class ProductCategory(enum.Enum):
     ELECTRONICS = "Электроника"
     CLOTHING = "Одежда"
@@ -30,23 +45,40 @@ class Product(Base):
     sales = relationship("Sale", back_populates="product")
     supplies = relationship("Supply", back_populates="product")
 
+# Индекс по выражению: запрос товаров с низким запасом сравнивает два
+# столбца, и обычный индекс для него не подходит
+Index('ix_product_deficit', Product.quantity - Product.min_stock)
+
 class Customer(Base):
     """Модель клиента"""
     __tablename__ = 'customers'
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
-    phone = Column(String(20), unique=True, nullable=True)
-    email = Column(String(100), unique=True, nullable=True)
+    phone = Column(TrimmedString(20), unique=True, nullable=True)
+    email = Column(TrimmedString(100), unique=True, nullable=True)
     discount = Column(Float, default=0.0)
-    total_purchases = Column(Float, default=0.0)
     created_at = Column(DateTime, default=datetime.now)
     
     sales = relationship("Sale", back_populates="customer")
+    
+    @validates('phone', 'email')
+    def _trim_contacts(self, key, value):
+        # Объект хранит то же значение, что попадет в базу
+        return trim_string(value)
 
 class Sale(Base):
     """Модель продажи"""
     __tablename__ = 'sales'
+    __table_args__ = (
+        # Покрывающий индекс для агрегации проданного количества по товару,
+        # он же обслуживает поиск продаж по product_id
+        Index('ix_sale_product_qty', 'product_id', 'quantity'),
+        # Выборки за период; total позволяет считать сумму по индексу
+        Index('ix_sale_date', 'date', 'total'),
+        # Покупки клиента по дате и сумма его покупок
+        Index('ix_sale_customer_date', 'customer_id', 'date', 'total'),
+    )
     
     id = Column(Integer, primary_key=True)
     product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
@@ -55,13 +87,30 @@ class Sale(Base):
     price = Column(Float, nullable=False)
     total = Column(Float, nullable=False)
     date = Column(DateTime, default=datetime.now)
+    # Копии названий товара и клиента, чтобы история читалась без JOIN;
+    # при переименовании товара DatabaseManager.update_product обновляет product_name
+    product_name = Column(String(200))
+    customer_name = Column(String(100))
     
     product = relationship("Product", back_populates="sales")
     customer = relationship("Customer", back_populates="sales")
 
+# Сумма покупок клиента считается по продажам в том же SELECT, что и
+# сам клиент, вместо отдельного столбца, который приходилось обновлять
+Customer.total_purchases = column_property(
+    select(func.coalesce(func.sum(Sale.total), 0.0))
+    .where(Sale.customer_id == Customer.id)
+    .correlate_except(Sale)
+    .scalar_subquery()
+)
+
 class Supply(Base):
     """Модель поставки"""
     __tablename__ = 'supplies'
+    __table_args__ = (
+        Index('ix_supply_product', 'product_id'),
+        Index('ix_supply_date', 'date'),
+    )
     
     id = Column(Integer, primary_key=True)
     supplier = Column(String(200), nullable=False)
@@ -69,6 +118,9 @@ class Supply(Base):
     quantity = Column(Integer, nullable=False)
     cost = Column(Float, nullable=False)
     date = Column(DateTime, default=datetime.now)
+    # Копия названия товара, чтобы история читалась без JOIN;
+    # переименование товара обновляет ее
+    product_name = Column(String(200))
     
     product = relationship("Product", back_populates="supplies")
 
@@ -87,6 +139,9 @@ class Employee(Base):
 class InventoryCheck(Base):
     """Модель проверки инвентаря"""
     __tablename__ = 'inventory_checks'
+    __table_args__ = (
+        Index('ix_invcheck_product', 'product_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
@@ -1,11 +1,15 @@
 import sys
 import os
-from PyQt5.QtWidgets import QApplication, QTableWidgetItem, QMessageBox, QTableWidget
-from PyQt5.QtCore import Qt
+from datetime import datetime, timedelta
+from functools import cached_property
+from PyQt5.QtWidgets import QApplication, QMessageBox, QAbstractItemView
+from PyQt5.QtCore import Qt, QThreadPool, QTimer
 from ui.main_window import ModernMainWindow
+from ui.loaders import Loader
 from database.db_manager import DatabaseManager
-from database.models import ProductCategory
-from reports.inventory_reports import InventoryReports
+
+# Сколько записей истории продаж и поставок показывать на странице
+HISTORY_PAGE_SIZE = 100
 
 class StoreApp:
     """Главный класс приложения магазина"""
@@ -16,7 +20,6 @@ class StoreApp:
         
         # Инициализация компонентов
         self.db = DatabaseManager()
-        self.reports = InventoryReports(self.db)
         
         # Создание главного окна
         self.main_window = ModernMainWindow()
@@ -24,6 +27,36 @@ class StoreApp:
         # переменная для отслеживания режима редактирования
         self.editing_product_id = None
         
+        # текущие страницы истории продаж и поставок (с нуля)
+        self.sales_page = 0
+        self.supplies_page = 0
+        # всего записей в истории, None - еще не загружено
+        self.sales_total = None
+        self.supplies_total = None
+        
+        # показанная статистика: (сумма продаж, товаров на складе,
+        # товаров с низким запасом); None - еще не посчитана
+        self._stats = None
+        
+        # кэш товаров и клиентов для таблиц и списков;
+        # None - нужно перечитать из базы
+        self._products = None
+        self._products_by_id = None
+        self._customers = None
+        
+        # Товары и история продаж загружаются в пуле потоков;
+        # номер загрузки растет с каждым запросом, а ответы
+        # устаревших загрузок отбрасываются
+        self.thread_pool = QThreadPool.globalInstance()
+        self._products_generation = 0
+        self._products_loading = False
+        self._sales_generation = 0
+        self._sales_loading = False
+        
+        # выпадающие списки перестраиваются один раз за цикл событий,
+        # сколько бы изменений ни произошло перед этим
+        self._combos_dirty = False
+        
         # Подключение сигналов
         self.connect_signals()
         
@@ -36,18 +69,22 @@ class StoreApp:
         self.main_window.add_product_btn.clicked.connect(self.add_product)
         self.main_window.edit_product_btn.clicked.connect(self.edit_product)
         self.main_window.delete_product_btn.clicked.connect(self.delete_product)
-        self.main_window.refresh_products_btn.clicked.connect(self.refresh_products)
+        self.main_window.refresh_products_btn.clicked.connect(self.reload_products)
         
         # Двойной клик по таблице для редактирования
-        self.main_window.products_table.itemDoubleClicked.connect(self.on_product_double_clicked)
+        self.main_window.products_table.doubleClicked.connect(self.on_product_double_clicked)
         # Настройка выбора строк вместо ячеек
-        self.main_window.products_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.main_window.products_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         
         # Продажи
         self.main_window.process_sale_btn.clicked.connect(self.process_sale)
+        self.main_window.sales_prev_btn.clicked.connect(self.prev_sales_page)
+        self.main_window.sales_next_btn.clicked.connect(self.next_sales_page)
         
         # Поставки
         self.main_window.add_supply_btn.clicked.connect(self.add_supply)
+        self.main_window.supplies_prev_btn.clicked.connect(self.prev_supplies_page)
+        self.main_window.supplies_next_btn.clicked.connect(self.next_supplies_page)
         
         # Клиенты
         self.main_window.add_customer_btn.clicked.connect(self.add_customer)
@@ -66,10 +103,6 @@ class StoreApp:
         # Загрузка клиентов
         self.refresh_customers()
         
-        # Заполнение списков для продаж и поставок
-        self.refresh_sales_combos()
-        self.refresh_supplies_combos()
-        
         # Загрузка истории продаж и поставок
         self.refresh_sales_history()
         self.refresh_supplies_history()
@@ -81,7 +114,7 @@ class StoreApp:
         """Добавление товара"""
         try:
             name = self.main_window.product_name_input.text().strip()
-            category_text = self.main_window.product_category_input.currentText()
+            category = self.main_window.product_category_input.currentData()
             price = self.main_window.product_price_input.value()
             quantity = self.main_window.product_quantity_input.value()
             min_stock = self.main_window.product_min_stock_input.value()
@@ -90,16 +123,6 @@ class StoreApp:
                 self.main_window.show_message("Ошибка", "Введите название товара")
                 return
             
-            # Преобразуем строку категории в Enum
-            category_map = {
-                "Электроника": ProductCategory.ELECTRONICS,
-                "Одежда": ProductCategory.CLOTHING,
-                "Продукты": ProductCategory.FOOD,
-                "Книги": ProductCategory.BOOKS,
-                "Другое": ProductCategory.OTHER
-            }
-            
-            category = category_map.get(category_text)
             if category is None:
                 self.main_window.show_message("Ошибка", "Неверная категория товара")
                 return
@@ -131,7 +154,7 @@ class StoreApp:
                     self.main_window.show_message("Успех", f"Товар '{name}' добавлен!")
             
             if product:
-                self.refresh_products()
+                self.apply_product_change(self.db.get_product_light(product.id))
                 self.clear_product_form()
             else:
                 self.main_window.show_message("Ошибка", "Не удалось сохранить товар")
@@ -139,35 +162,148 @@ class StoreApp:
         except Exception as e:
             self.main_window.show_message("Ошибка", f"Ошибка при сохранении товара: {str(e)}")
     
+    def get_products(self):
+        """Список товаров из кэша, при необходимости из базы"""
+        if self._products is None:
+            self._products = self.db.get_all_products_light()
+            self._products_by_id = {product.id: product for product in self._products}
+        return self._products
+    
+    def get_cached_product(self, product_id):
+        """Товар из кэша по ID"""
+        self.get_products()
+        return self._products_by_id.get(product_id)
+    
+    def invalidate_products(self):
+        """Сбросить кэш товаров после изменения"""
+        self._products = None
+        self._products_by_id = None
+    
+    def get_customers(self):
+        """Список клиентов из кэша, при необходимости из базы"""
+        if self._customers is None:
+            self._customers = self.db.get_all_customers_light()
+        return self._customers
+    
+    def invalidate_customers(self):
+        """Сбросить кэш клиентов после изменения"""
+        self._customers = None
+    
+    def apply_product_change(self, product, adjust_stock=True):
+        """Обновить один товар в кэше, таблице и статистике
+        без перечитывания списка
+        
+        product - строка из DatabaseManager.get_product_light, того же
+        вида, что и остальные товары в кэше; None, если товара уже нет.
+        adjust_stock=False - статистика уже пересчитана по базе и
+        поправлять ее на изменение остатка не нужно.
+        """
+        if product is None or self._products is None or self._products_loading:
+            # Список еще не загружен, загружается или товар успел
+            # исчезнуть: перечитываем список и статистику целиком
+            self.invalidate_products()
+            self.refresh_products()
+            self.update_statistics()
+            return
+        old = self._products_by_id.get(product.id)
+        self._products_by_id[product.id] = product
+        self._products = list(self._products_by_id.values())
+        self.main_window.products_model.update_row(product)
+        self.schedule_combos_refresh()
+        
+        if not adjust_stock:
+            return
+        self.adjust_statistics(
+            quantity=product.quantity - (old.quantity if old else 0),
+            low_stock=self.is_low_stock(product) - (self.is_low_stock(old) if old else 0)
+        )
+    
+    def is_low_stock(self, product):
+        """Товар с низким запасом (как в DatabaseManager.get_stock_stats)"""
+        return product.quantity < product.min_stock
+    
+    def apply_product_removal(self, product_id):
+        """Убрать товар из кэша и таблицы без перечитывания списка"""
+        if self._products is None or self._products_loading:
+            self.invalidate_products()
+            self.refresh_products()
+            return
+        self._products_by_id.pop(product_id, None)
+        self._products = list(self._products_by_id.values())
+        self.main_window.products_model.remove_row(product_id)
+        self.schedule_combos_refresh()
+    
+    def reload_products(self):
+        """Перечитать товары из базы по кнопке «Обновить»"""
+        self.invalidate_products()
+        self.invalidate_customers()
+        self.refresh_products()
+    
+    def start_loader(self, generation, load, on_loaded, on_failed, *args):
+        """Запустить загрузку в пуле потоков"""
+        loader = Loader(generation, load, *args)
+        loader.signals.loaded.connect(on_loaded)
+        loader.signals.failed.connect(on_failed)
+        self.thread_pool.start(loader)
+    
+    def show_load_error(self, error):
+        """Сообщить об ошибке фоновой загрузки"""
+        self.main_window.show_message("Ошибка", f"Ошибка загрузки данных: {error}")
+    
+    def on_products_load_failed(self, generation, error):
+        """Фоновая загрузка товаров завершилась ошибкой"""
+        if generation != self._products_generation:
+            return
+        self._products_loading = False
+        self.show_load_error(error)
+    
+    def on_sales_load_failed(self, generation, error):
+        """Фоновая загрузка истории продаж завершилась ошибкой"""
+        if generation != self._sales_generation:
+            return
+        self._sales_loading = False
+        self.show_load_error(error)
+    
+    def combo_products(self):
+        """Товары для выпадающих списков
+        
+        Пока товары загружаются в фоне, списки не ждут базу:
+        они заполнятся заново, когда загрузка завершится.
+        """
+        if self._products_loading:
+            return self._products or []
+        return self.get_products()
+    
     def refresh_products(self):
         """Обновление списка товаров"""
-        products = self.db.get_all_products()
-        
-        table = self.main_window.products_table
-        table.setRowCount(len(products))
-        
-        for row, product in enumerate(products):
-            table.setItem(row, 0, QTableWidgetItem(str(product.id)))
-            table.setItem(row, 1, QTableWidgetItem(product.name))
-            table.setItem(row, 2, QTableWidgetItem(product.category.value))
-            table.setItem(row, 3, QTableWidgetItem(f"{product.price:.2f} ₽"))
-            table.setItem(row, 4, QTableWidgetItem(str(product.quantity)))
-            table.setItem(row, 5, QTableWidgetItem(str(product.min_stock)))
-            
-            # Статус
-            status = "✅ В наличии"
-            if product.quantity == 0:
-                status = "❌ Нет в наличии"
-            elif product.quantity < product.min_stock:
-                status = "⚠️ Низкий запас"
-            
-            table.setItem(row, 6, QTableWidgetItem(status))
+        if self._products is not None:
+            self.show_products()
+            return
         
-        table.resizeColumnsToContents()
+        self._products_generation += 1
+        self._products_loading = True
+        self.start_loader(
+            self._products_generation,
+            self.db.get_all_products_light,
+            self.on_products_loaded,
+            self.on_products_load_failed
+        )
+    
+    def on_products_loaded(self, generation, products):
+        """Товары загружены в фоне"""
+        if generation != self._products_generation:
+            return
+        self._products_loading = False
+        self._products = products
+        self._products_by_id = {product.id: product for product in products}
+        self.show_products()
+    
+    def show_products(self):
+        """Показать товары из кэша"""
+        self.main_window.products_model.set_rows(self._products)
         
         # Обновляем списки товаров в продажах и поставках
-        self.refresh_sales_combos()
-        self.refresh_supplies_combos()
+        self.schedule_combos_refresh()
     
     def clear_product_form(self):
         """Очистка формы товара"""
@@ -179,17 +315,13 @@ class StoreApp:
         self.editing_product_id = None
         self.main_window.add_product_btn.setText("➕ Добавить товар")
     
-    def on_product_double_clicked(self, item):
+    def on_product_double_clicked(self, index):
         """Обработка двойного клика по товару в таблице"""
-        row = item.row()
-        product_id_item = self.main_window.products_table.item(row, 0)
-        if product_id_item:
-            product_id = int(product_id_item.text())
-            self.load_product_for_edit(product_id)
+        self.load_product_for_edit(index.data(Qt.UserRole))
     
     def load_product_for_edit(self, product_id):
         """Загрузка товара в форму для редактирования"""
-        product = self.db.get_product_by_id(product_id)
+        product = self.get_cached_product(product_id)
         if not product:
             self.main_window.show_message("Ошибка", "Товар не найден")
             return
@@ -198,15 +330,7 @@ class StoreApp:
         self.main_window.product_name_input.setText(product.name)
         
         # Устанавливаем категорию
-        category_map = {
-            ProductCategory.ELECTRONICS: "Электроника",
-            ProductCategory.CLOTHING: "Одежда",
-            ProductCategory.FOOD: "Продукты",
-            ProductCategory.BOOKS: "Книги",
-            ProductCategory.OTHER: "Другое"
-        }
-        category_text = category_map.get(product.category, "Другое")
-        index = self.main_window.product_category_input.findText(category_text)
+        index = self.main_window.product_category_input.findData(product.category)
         if index >= 0:
             self.main_window.product_category_input.setCurrentIndex(index)
         
@@ -224,11 +348,7 @@ class StoreApp:
         if not selected_rows:
             return None
         
-        row = selected_rows[0].row()
-        product_id_item = self.main_window.products_table.item(row, 0)
-        if product_id_item:
-            return int(product_id_item.text())
-        return None
+        return selected_rows[0].data(Qt.UserRole)
     
     def edit_product(self):
         """Редактирование товара"""
@@ -247,7 +367,7 @@ class StoreApp:
             return
         
         # Получаем информацию о товаре для подтверждения
-        product = self.db.get_product_by_id(product_id)
+        product = self.get_cached_product(product_id)
         if not product:
             self.main_window.show_message("Ошибка", "Товар не найден")
             return
@@ -280,7 +400,7 @@ class StoreApp:
                 success = self.db.delete_product(product_id)
                 if success:
                     self.main_window.show_message("Успех", f"Товар '{product.name}' удален!")
-                    self.refresh_products()
+                    self.apply_product_removal(product_id)
                     self.clear_product_form()
                     self.update_statistics()
                 else:
@@ -288,85 +408,190 @@ class StoreApp:
             except Exception as e:
                 self.main_window.show_message("Ошибка", f"Ошибка при удалении товара: {str(e)}")
     
-    def refresh_sales_combos(self):
-        """Обновление списков товаров и клиентов для продаж"""
-        # Заполняем список товаров
-        products = self.db.get_all_products()
-        combo = self.main_window.sale_product_combo
+    def schedule_combos_refresh(self):
+        """Запланировать обновление выпадающих списков"""
+        if self._combos_dirty:
+            return
+        self._combos_dirty = True
+        QTimer.singleShot(0, self.refresh_combos)
+    
+    def refresh_combos(self):
+        """Обновление всех выпадающих списков"""
+        self._combos_dirty = False
+        products = self.combo_products()
+        self.refresh_sales_combos(products)
+        self.refresh_supplies_combos(products)
+    
+    def fill_combo(self, combo, placeholder, items):
+        """Заполнить выпадающий список парами (текст, ID) за один проход"""
+        # Сигналы отключены, чтобы список не перерисовывался на каждом пункте
+        combo.blockSignals(True)
         combo.clear()
-        combo.addItem("-- Выберите товар --")
+        combo.addItems([placeholder] + [text for text, _ in items])
         combo.setItemData(0, None)
-        for product in products:
-            index = combo.count()
-            combo.addItem(f"{product.name} (ID: {product.id}, в наличии: {product.quantity})")
-            combo.setItemData(index, product.id)
+        for index, (_, item_id) in enumerate(items, start=1):
+            combo.setItemData(index, item_id)
+        combo.blockSignals(False)
+    
+    def refresh_sales_combos(self, products):
+        """Обновление списков товаров и клиентов для продаж"""
+        # Заполняем список товаров
+        self.fill_combo(
+            self.main_window.sale_product_combo,
+            "-- Выберите товар --",
+            [(f"{product.name} (ID: {product.id}, в наличии: {product.quantity})", product.id)
+             for product in products]
+        )
         
         # Заполняем список клиентов
-        customers = self.db.get_all_customers()
-        combo = self.main_window.sale_customer_combo
-        combo.clear()
-        combo.addItem("-- Без клиента --")
-        combo.setItemData(0, None)
-        for customer in customers:
-            index = combo.count()
-            combo.addItem(f"{customer.name} (ID: {customer.id})")
-            combo.setItemData(index, customer.id)
+        self.fill_combo(
+            self.main_window.sale_customer_combo,
+            "-- Без клиента --",
+            [(f"{customer.name} (ID: {customer.id})", customer.id)
+             for customer in self.get_customers()]
+        )
     
-    def refresh_supplies_combos(self):
+    def refresh_supplies_combos(self, products):
         """Обновление списка товаров для поставок"""
-        products = self.db.get_all_products()
-        combo = self.main_window.supply_product_combo
-        combo.clear()
-        combo.addItem("-- Выберите товар --")
-        combo.setItemData(0, None)
-        for product in products:
-            index = combo.count()
-            combo.addItem(f"{product.name} (ID: {product.id})")
-            combo.setItemData(index, product.id)
+        self.fill_combo(
+            self.main_window.supply_product_combo,
+            "-- Выберите товар --",
+            [(f"{product.name} (ID: {product.id})", product.id)
+             for product in products]
+        )
     
     def refresh_sales_history(self):
         """Обновление истории продаж"""
-        from datetime import datetime, timedelta
+        self._sales_generation += 1
+        self._sales_loading = True
+        self.start_loader(
+            self._sales_generation,
+            self.load_sales_page,
+            self.on_sales_loaded,
+            self.on_sales_load_failed,
+            self.sales_page
+        )
+    
+    def load_sales_page(self, page):
+        """Загрузить страницу истории продаж (выполняется в пуле потоков)"""
         # Получаем все продажи за последние 30 дней
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365)  # Показываем за последний год
         
-        sales = self.db.get_sales_by_date_range(start_date, end_date)
-        
-        table = self.main_window.sales_history_table
-        table.setRowCount(len(sales))
-        
-        for row, sale in enumerate(sales):
-            product = self.db.get_product_by_id(sale.product_id)
-            customer = self.db.get_customer_by_id(sale.customer_id) if sale.customer_id else None
-            
-            table.setItem(row, 0, QTableWidgetItem(str(sale.id)))
-            table.setItem(row, 1, QTableWidgetItem(sale.date.strftime("%d.%m.%Y %H:%M")))
-            table.setItem(row, 2, QTableWidgetItem(product.name if product else "Неизвестно"))
-            table.setItem(row, 3, QTableWidgetItem(str(sale.quantity)))
-            table.setItem(row, 4, QTableWidgetItem(f"{sale.total:.2f} ₽"))
-            table.setItem(row, 5, QTableWidgetItem(customer.name if customer else "—"))
-        
-        table.resizeColumnsToContents()
+        # Загружаем только текущую страницу
+        total = self.db.count_sales_by_date_range(start_date, end_date)
+        pages = self.page_count(total)
+        page = min(page, pages - 1)
+        
+        # Названия товара и клиента хранятся в самих продажах
+        sales = self.db.get_sales_by_date_range(
+            start_date, end_date,
+            limit=HISTORY_PAGE_SIZE,
+            offset=page * HISTORY_PAGE_SIZE,
+            with_relations=False
+        )
+        return page, total, sales
+    
+    def on_sales_loaded(self, generation, result):
+        """Страница истории продаж загружена в фоне"""
+        if generation != self._sales_generation:
+            return
+        self._sales_loading = False
+        self.sales_page, self.sales_total, sales = result
+        self.main_window.sales_model.set_rows(sales)
+        self.update_sales_page_controls()
+    
+    def update_sales_page_controls(self):
+        """Обновление переключателя страниц истории продаж"""
+        self.update_page_controls(
+            self.main_window.sales_page_label,
+            self.main_window.sales_prev_btn,
+            self.main_window.sales_next_btn,
+            self.sales_page, self.page_count(self.sales_total)
+        )
+    
+    def show_new_sale(self, sale):
+        """Добавить новую продажу в начало истории"""
+        if self.sales_page != 0 or self._sales_loading or self.sales_total is None:
+            self.refresh_sales_history()
+            return
+        self.sales_total += 1
+        self.prepend_history_row(self.main_window.sales_model, sale)
+        self.update_sales_page_controls()
     
     def refresh_supplies_history(self):
         """Обновление истории поставок"""
-        supplies = self.db.get_all_supplies()
-        
-        table = self.main_window.supplies_table
-        table.setRowCount(len(supplies))
-        
-        for row, supply in enumerate(supplies):
-            product = self.db.get_product_by_id(supply.product_id)
-            
-            table.setItem(row, 0, QTableWidgetItem(str(supply.id)))
-            table.setItem(row, 1, QTableWidgetItem(supply.date.strftime("%d.%m.%Y %H:%M")))
-            table.setItem(row, 2, QTableWidgetItem(supply.supplier))
-            table.setItem(row, 3, QTableWidgetItem(product.name if product else "Неизвестно"))
-            table.setItem(row, 4, QTableWidgetItem(str(supply.quantity)))
-            table.setItem(row, 5, QTableWidgetItem(f"{supply.cost:.2f} ₽"))
-        
-        table.resizeColumnsToContents()
+        # Загружаем только текущую страницу
+        self.supplies_total = self.db.count_supplies()
+        pages = self.page_count(self.supplies_total)
+        self.supplies_page = min(self.supplies_page, pages - 1)
+        
+        # Название товара хранится в самих поставках
+        supplies = self.db.get_all_supplies(
+            limit=HISTORY_PAGE_SIZE,
+            offset=self.supplies_page * HISTORY_PAGE_SIZE,
+            with_relations=False
+        )
+        self.main_window.supplies_model.set_rows(supplies)
+        self.update_supplies_page_controls()
+    
+    def update_supplies_page_controls(self):
+        """Обновление переключателя страниц истории поставок"""
+        self.update_page_controls(
+            self.main_window.supplies_page_label,
+            self.main_window.supplies_prev_btn,
+            self.main_window.supplies_next_btn,
+            self.supplies_page, self.page_count(self.supplies_total)
+        )
+    
+    def show_new_supply(self, supply):
+        """Добавить новую поставку в начало истории"""
+        if self.supplies_page != 0 or self.supplies_total is None:
+            self.refresh_supplies_history()
+            return
+        self.supplies_total += 1
+        self.prepend_history_row(self.main_window.supplies_model, supply)
+        self.update_supplies_page_controls()
+    
+    def prepend_history_row(self, model, row):
+        """Вставить запись в начало первой страницы истории,
+        вытеснив последнюю, если страница переполнилась"""
+        model.insert_row(0, row)
+        if model.rowCount() > HISTORY_PAGE_SIZE:
+            last = model.index(model.rowCount() - 1, 0)
+            model.remove_row(last.data(Qt.UserRole))
+    
+    def page_count(self, total):
+        """Количество страниц истории (хотя бы одна)"""
+        return max(1, (total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE)
+    
+    def update_page_controls(self, label, prev_btn, next_btn, page, pages):
+        """Обновление подписи и кнопок переключения страниц"""
+        label.setText(f"Страница {page + 1} из {pages}")
+        prev_btn.setEnabled(page > 0)
+        next_btn.setEnabled(page < pages - 1)
+    
+    def prev_sales_page(self):
+        """Предыдущая страница истории продаж"""
+        if self.sales_page > 0:
+            self.sales_page -= 1
+            self.refresh_sales_history()
+    
+    def next_sales_page(self):
+        """Следующая страница истории продаж"""
+        self.sales_page += 1
+        self.refresh_sales_history()
+    
+    def prev_supplies_page(self):
+        """Предыдущая страница истории поставок"""
+        if self.supplies_page > 0:
+            self.supplies_page -= 1
+            self.refresh_supplies_history()
+    
+    def next_supplies_page(self):
+        """Следующая страница истории поставок"""
+        self.supplies_page += 1
+        self.refresh_supplies_history()
     
     def process_sale(self):
         """Обработка продажи"""
@@ -386,29 +611,31 @@ class StoreApp:
                 self.main_window.show_message("Ошибка", "Количество должно быть больше 0")
                 return
             
-            # Проверяем наличие товара
-            product = self.db.get_product_by_id(product_id)
-            if not product:
-                self.main_window.show_message("Ошибка", "Товар не найден")
-                return
-            
-            if product.quantity < quantity:
-                self.main_window.show_message("Ошибка", 
-                    f"Недостаточно товара на складе. Доступно: {product.quantity}")
-                return
-            
-            # Оформляем продажу
+            # Оформляем продажу: наличие товара проверяется при списании
             sale = self.db.record_sale(product_id, quantity, customer_id)
             
             if sale:
                 self.main_window.show_message("Успех", f"Продажа оформлена на сумму {sale.total:.2f} ₽")
-                self.refresh_products()
-                self.refresh_sales_history()
-                self.update_statistics()
+                # Обновляем только затронутые строки и счетчики
+                # Сумма продаж поправляется первой: если товар придется
+                # перечитывать целиком, статистика пересчитается заново
+                adjusted = self.adjust_statistics(sales=sale.total)
+                self.show_new_sale(sale)
+                self.apply_product_change(
+                    self.db.get_product_light(product_id), adjust_stock=adjusted
+                )
                 # Сбрасываем форму
                 self.main_window.sale_quantity_spin.setValue(1)
             else:
-                self.main_window.show_message("Ошибка", "Не удалось оформить продажу")
+                # Товар читается только ради сообщения об ошибке
+                product = self.db.get_product_by_id(product_id)
+                if not product:
+                    self.main_window.show_message("Ошибка", "Товар не найден")
+                elif product.quantity < quantity:
+                    self.main_window.show_message("Ошибка", 
+                        f"Недостаточно товара на складе. Доступно: {product.quantity}")
+                else:
+                    self.main_window.show_message("Ошибка", "Не удалось оформить продажу")
                 
         except Exception as e:
             self.main_window.show_message("Ошибка", f"Ошибка при оформлении продажи: {str(e)}")
@@ -441,9 +668,9 @@ class StoreApp:
             
             if supply:
                 self.main_window.show_message("Успех", f"Поставка добавлена!")
-                self.refresh_products()
-                self.refresh_supplies_history()
-                self.update_statistics()
+                # Обновляем только затронутые строки и счетчики
+                self.apply_product_change(self.db.get_product_light(product_id))
+                self.show_new_supply(supply)
                 # Очищаем форму
                 self.main_window.supplier_input.clear()
                 self.main_window.supply_quantity_spin.setValue(1)
@@ -473,6 +700,7 @@ class StoreApp:
             
             if customer:
                 self.main_window.show_message("Успех", f"Клиент '{name}' добавлен!")
+                self.invalidate_customers()
                 self.refresh_customers()
                 self.clear_customer_form()
                 
@@ -481,22 +709,11 @@ class StoreApp:
     
     def refresh_customers(self):
         """Обновление списка клиентов"""
-        customers = self.db.get_all_customers()
-        
-        table = self.main_window.customers_table
-        table.setRowCount(len(customers))
-        
-        for row, customer in enumerate(customers):
-            table.setItem(row, 0, QTableWidgetItem(str(customer.id)))
-            table.setItem(row, 1, QTableWidgetItem(customer.name))
-            table.setItem(row, 2, QTableWidgetItem(customer.phone or ""))
-            table.setItem(row, 3, QTableWidgetItem(customer.email or "—"))
-            table.setItem(row, 4, QTableWidgetItem(f"{customer.discount:.1f}%"))
-        
-        table.resizeColumnsToContents()
+        customers = self.get_customers()
+        self.main_window.customers_model.set_rows(customers)
         
         # Обновляем список клиентов в продажах
-        self.refresh_sales_combos()
+        self.schedule_combos_refresh()
     
     def clear_customer_form(self):
         """Очистка формы клиента"""
@@ -510,20 +727,44 @@ class StoreApp:
         try:
             # Общие продажи
             total_sales = self.db.get_total_sales_amount()
-            self.main_window.total_sales_label.setText(f"Общие продажи: {total_sales:.2f} ₽")
             
-            # Товары на складе
-            products = self.db.get_all_products()
-            total_products = sum(p.quantity for p in products)
-            self.main_window.total_products_label.setText(f"Товаров на складе: {total_products}")
+            # Товары на складе и с низким запасом
+            total_products, low_stock = self.db.get_stock_stats()
             
-            # Товары с низким запасом
-            low_stock = len(self.db.get_low_stock_products())
-            self.main_window.low_stock_label.setText(f"Товаров с низким запасом: {low_stock}")
+            self.show_statistics(total_sales, total_products, low_stock)
             
         except Exception as e:
             print(f"Ошибка обновления статистики: {e}")
     
+    def show_statistics(self, total_sales, total_products, low_stock):
+        """Показать статистику"""
+        self._stats = (total_sales, total_products, low_stock)
+        self.main_window.total_sales_label.setText(f"Общие продажи: {total_sales:.2f} ₽")
+        self.main_window.total_products_label.setText(f"Товаров на складе: {total_products}")
+        self.main_window.low_stock_label.setText(f"Товаров с низким запасом: {low_stock}")
+    
+    def adjust_statistics(self, sales=0.0, quantity=0, low_stock=0):
+        """Поправить показанную статистику на изменения одной операции
+        
+        Если статистики еще нет, она пересчитывается по базе целиком,
+        уже с учетом операции; тогда возвращается False.
+        """
+        if self._stats is None:
+            self.update_statistics()
+            return False
+        total_sales, total_products, low = self._stats
+        self.show_statistics(
+            total_sales + sales, total_products + quantity, low + low_stock
+        )
+        return True
+    
+    @cached_property
+    def reports(self):
+        """Отчеты создаются при первом обращении: модуль отчетов тянет
+        pandas и matplotlib, которые не нужны для запуска окна"""
+        from reports.inventory_reports import InventoryReports
+        return InventoryReports(self.db)
+    
     def show_sales_report(self):
         """Показать отчет по продажам"""
         report = self.reports.generate_sales_report()
@@ -0,0 +1,35 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class LoaderSignals(QObject):
+    """Сигналы фоновой загрузки
+
+    QRunnable не является QObject, поэтому сигналы вынесены в отдельный
+    объект. Он создается в потоке интерфейса, и обработчики вызываются
+    там же через очередь событий.
+    """
+    loaded = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class Loader(QRunnable):
+    """Выполняет запрос к базе в пуле потоков
+
+    generation - номер загрузки; по нему получатель отбрасывает ответы
+    запросов, которые успели устареть.
+    """
+
+    def __init__(self, generation, load, *args):
+        super().__init__()
+        self.generation = generation
+        self.load = load
+        self.args = args
+        self.signals = LoaderSignals()
+
+    def run(self):
+        try:
+            result = self.load(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.loaded.emit(self.generation, result)
@@ -3,6 +3,10 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from datetime import datetime
+from .table_models import (
+    CATEGORY_LABELS,
+    ProductTableModel, SalesTableModel, SuppliesTableModel, CustomerTableModel
+)
 
 class ModernMainWindow(QMainWindow):
     def __init__(self):
@@ -56,12 +60,12 @@ class ModernMainWindow(QMainWindow):
                 background-color: white;
                 font-weight: bold;
             }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 1px solid #ddd;
                 gridline-color: #eee;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 4px;
             }
             QHeaderView::section {
@@ -178,7 +182,9 @@ class ModernMainWindow(QMainWindow):
         
         form_layout.addWidget(QLabel("Категория:"), 1, 0)
         self.product_category_input = QComboBox()
-        self.product_category_input.addItems(["Электроника", "Одежда", "Продукты", "Книги", "Другое"])
+        # В данных пункта хранится сама категория, текст только для показа
+        for category, label in CATEGORY_LABELS:
+            self.product_category_input.addItem(label, category)
         form_layout.addWidget(self.product_category_input, 1, 1)
         
         form_layout.addWidget(QLabel("Цена:"), 2, 0)
@@ -200,13 +206,12 @@ class ModernMainWindow(QMainWindow):
         form_panel.setLayout(form_layout)
         
         # Таблица товаров
-        self.products_table = QTableWidget()
-        self.products_table.setColumnCount(7)
-        self.products_table.setHorizontalHeaderLabels([
-            "ID", "Название", "Категория", "Цена", "Количество", 
-            "Минимум", "Статус"
-        ])
+        self.products_model = ProductTableModel(self)
+        self.products_table = QTableView()
+        self.products_table.setModel(self.products_model)
         self.products_table.setSortingEnabled(True)
+        self.products_table.sortByColumn(0, Qt.AscendingOrder)
+        self.setup_table_columns(self.products_table, [50, 250, 120, 100, 100, 90])
         
         # Сборка вкладки
         layout.addWidget(control_panel)
@@ -244,15 +249,25 @@ class ModernMainWindow(QMainWindow):
         sales_control.setLayout(sales_layout)
         
         # История продаж
-        self.sales_history_table = QTableWidget()
-        self.sales_history_table.setColumnCount(6)
-        self.sales_history_table.setHorizontalHeaderLabels([
-            "ID", "Дата", "Товар", "Количество", "Сумма", "Клиент"
-        ])
+        self.sales_model = SalesTableModel(self)
+        self.sales_history_table = QTableView()
+        self.sales_history_table.setModel(self.sales_model)
+        self.setup_table_columns(self.sales_history_table, [50, 130, 250, 100, 110])
+        
+        # Переключение страниц истории
+        sales_pages_layout = QHBoxLayout()
+        self.sales_prev_btn = QPushButton("◀ Назад")
+        self.sales_page_label = QLabel("Страница 1 из 1")
+        self.sales_next_btn = QPushButton("Вперед ▶")
+        sales_pages_layout.addStretch()
+        sales_pages_layout.addWidget(self.sales_prev_btn)
+        sales_pages_layout.addWidget(self.sales_page_label)
+        sales_pages_layout.addWidget(self.sales_next_btn)
         
         layout.addWidget(sales_control)
         layout.addWidget(QLabel("<b>История продаж:</b>"))
         layout.addWidget(self.sales_history_table)
+        layout.addLayout(sales_pages_layout)
         
         tab.setLayout(layout)
         return tab
@@ -291,15 +306,25 @@ class ModernMainWindow(QMainWindow):
         supply_form.setLayout(form_layout)
         
         # История поставок
-        self.supplies_table = QTableWidget()
-        self.supplies_table.setColumnCount(6)
-        self.supplies_table.setHorizontalHeaderLabels([
-            "ID", "Дата", "Поставщик", "Товар", "Количество", "Стоимость"
-        ])
+        self.supplies_model = SuppliesTableModel(self)
+        self.supplies_table = QTableView()
+        self.supplies_table.setModel(self.supplies_model)
+        self.setup_table_columns(self.supplies_table, [50, 130, 200, 250, 100])
+        
+        # Переключение страниц истории
+        supplies_pages_layout = QHBoxLayout()
+        self.supplies_prev_btn = QPushButton("◀ Назад")
+        self.supplies_page_label = QLabel("Страница 1 из 1")
+        self.supplies_next_btn = QPushButton("Вперед ▶")
+        supplies_pages_layout.addStretch()
+        supplies_pages_layout.addWidget(self.supplies_prev_btn)
+        supplies_pages_layout.addWidget(self.supplies_page_label)
+        supplies_pages_layout.addWidget(self.supplies_next_btn)
         
         layout.addWidget(supply_form)
         layout.addWidget(QLabel("<b>История поставок:</b>"))
         layout.addWidget(self.supplies_table)
+        layout.addLayout(supplies_pages_layout)
         
         tab.setLayout(layout)
         return tab
@@ -337,11 +362,10 @@ class ModernMainWindow(QMainWindow):
         customer_form.setLayout(form_layout)
         
         # Таблица клиентов
-        self.customers_table = QTableWidget()
-        self.customers_table.setColumnCount(5)
-        self.customers_table.setHorizontalHeaderLabels([
-            "ID", "Имя", "Телефон", "Email", "Скидка"
-        ])
+        self.customers_model = CustomerTableModel(self)
+        self.customers_table = QTableView()
+        self.customers_table.setModel(self.customers_model)
+        self.setup_table_columns(self.customers_table, [50, 200, 150, 200])
         
         layout.addWidget(customer_form)
         layout.addWidget(QLabel("<b>Список клиентов:</b>"))
@@ -399,6 +423,14 @@ class ModernMainWindow(QMainWindow):
         tab.setLayout(layout)
         return tab
         
+    def setup_table_columns(self, table, widths):
+        """Задать ширину столбцов один раз; последний растягивается"""
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(True)
+        for column, width in enumerate(widths):
+            table.setColumnWidth(column, width)
+        
     def create_status_bar(self):
         """Создание статус-бара"""
         self.status_bar = self.statusBar()
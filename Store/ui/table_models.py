@@ -0,0 +1,249 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from database.models import ProductCategory
+
+# Категории товара в порядке списка и их подписи в интерфейсе
+CATEGORY_LABELS = [
+    (ProductCategory.ELECTRONICS, "Электроника"),
+    (ProductCategory.CLOTHING, "Одежда"),
+    (ProductCategory.FOOD, "Продукты"),
+    (ProductCategory.BOOKS, "Книги"),
+    (ProductCategory.OTHER, "Другое"),
+]
+CATEGORY_DISPLAY = dict(CATEGORY_LABELS)
+
+
+def _sort_key(value):
+    """Ключ сортировки, при котором пустые значения идут последними"""
+    if isinstance(value, str):
+        value = value.lower()
+    return (value is None, value)
+
+
+class RowTableModel(QAbstractTableModel):
+    """Табличная модель над списком объектов
+
+    Ячейки не хранятся: текст формируется в data() только для тех
+    строк, которые представление действительно рисует.
+    columns - список кортежей (заголовок, текст ячейки, ключ сортировки).
+    По роли Qt.UserRole любая ячейка строки возвращает ID объекта.
+    """
+    columns = []
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        # ID объекта -> номер строки
+        self._positions = {}
+        self._sort_column = None
+        self._sort_order = Qt.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.columns[index.column()][1](self._rows[index.row()])
+        if role == Qt.UserRole:
+            return self._rows[index.row()].id
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return super().headerData(section, orientation, role)
+
+    def set_rows(self, rows):
+        """Заменить все строки модели"""
+        rows = list(rows)
+        if (rows and len(rows) == len(self._rows)
+                and all(row.id in self._positions for row in rows)):
+            # Те же записи: обновляем по месту, выделение остается
+            # на тех же объектах
+            self._replace_changed(rows)
+            return
+
+        # Другой набор записей: сброс модели, иначе выделение осталось бы
+        # на прежних номерах строк, где теперь другие объекты
+
+        self.beginResetModel()
+        self._rows = rows
+        self._apply_sort()
+        self.endResetModel()
+
+    def update_row(self, row):
+        """Заменить строку с тем же ID или добавить новую"""
+        position = self._positions.get(row.id)
+        if position is None:
+            position = len(self._rows)
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._rows.append(row)
+            self._positions[row.id] = position
+            self.endInsertRows()
+        else:
+            self._rows[position] = row
+            self.dataChanged.emit(
+                self.index(position, 0),
+                self.index(position, len(self.columns) - 1)
+            )
+        if not self._in_order(position):
+            self.sort(self._sort_column, self._sort_order)
+
+    def insert_row(self, position, row):
+        """Вставить строку в указанную позицию"""
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.insert(position, row)
+        self._reindex()
+        self.endInsertRows()
+        if not self._in_order(position):
+            self.sort(self._sort_column, self._sort_order)
+
+    def remove_row(self, row_id):
+        """Удалить строку объекта с указанным ID"""
+        position = self._positions.get(row_id)
+        if position is None:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self._rows[position]
+        self._reindex()
+        self.endRemoveRows()
+
+    def _replace_changed(self, rows):
+        """Обновить по месту те же записи, сообщив только об изменившихся"""
+        changed = []
+        for row in rows:
+            position = self._positions[row.id]
+            # Сравниваются показанные значения: ORM-объекты
+            # без __eq__ иначе всегда считались бы разными
+            if self._display(self._rows[position]) != self._display(row):
+                changed.append(position)
+            self._rows[position] = row
+        if not changed:
+            return
+        self.dataChanged.emit(
+            self.index(min(changed), 0),
+            self.index(max(changed), len(self.columns) - 1)
+        )
+        if not all(self._in_order(position) for position in changed):
+            self.sort(self._sort_column, self._sort_order)
+
+    def _display(self, row):
+        """Тексты всех ячеек строки"""
+        return tuple(column[1](row) for column in self.columns)
+
+    def _in_order(self, position):
+        """Стоит ли строка на своем месте при текущей сортировке"""
+        if self._sort_column is None:
+            return True
+        key = self.columns[self._sort_column][2]
+        value = _sort_key(key(self._rows[position]))
+        neighbours = []
+        if position > 0:
+            neighbours.append((_sort_key(key(self._rows[position - 1])), value))
+        if position < len(self._rows) - 1:
+            neighbours.append((value, _sort_key(key(self._rows[position + 1]))))
+        if self._sort_order == Qt.DescendingOrder:
+            return all(left >= right for left, right in neighbours)
+        return all(left <= right for left, right in neighbours)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_rows = [self._rows[index.row()] for index in persistent]
+
+        self._sort_column = column
+        self._sort_order = order
+        self._apply_sort()
+
+        positions = {id(row): number for number, row in enumerate(self._rows)}
+        self.changePersistentIndexList(persistent, [
+            self.index(positions[id(row)], index.column())
+            for index, row in zip(persistent, persistent_rows)
+        ])
+        self.layoutChanged.emit()
+
+    def _apply_sort(self):
+        """Упорядочить строки по текущему столбцу сортировки"""
+        if self._sort_column is not None:
+            key = self.columns[self._sort_column][2]
+            self._rows.sort(
+                key=lambda row: _sort_key(key(row)),
+                reverse=self._sort_order == Qt.DescendingOrder
+            )
+        self._reindex()
+
+    def _reindex(self):
+        """Пересчитать номера строк по ID"""
+        self._positions = {row.id: number for number, row in enumerate(self._rows)}
+
+
+# Статусы товара: одни и те же строки для всех строк таблицы
+STATUS_IN_STOCK = "✅ В наличии"
+STATUS_OUT = "❌ Нет в наличии"
+STATUS_LOW = "⚠️ Низкий запас"
+
+
+def _product_status(product):
+    """Статус товара на основе количества"""
+    if product.quantity == 0:
+        return STATUS_OUT
+    if product.quantity < product.min_stock:
+        return STATUS_LOW
+    return STATUS_IN_STOCK
+
+
+class ProductTableModel(RowTableModel):
+    """Таблица товаров"""
+    columns = [
+        ("ID", lambda p: str(p.id), lambda p: p.id),
+        ("Название", lambda p: p.name, lambda p: p.name),
+        ("Категория", lambda p: CATEGORY_DISPLAY[p.category],
+         lambda p: CATEGORY_DISPLAY[p.category]),
+        ("Цена", lambda p: f"{p.price:.2f} ₽", lambda p: p.price),
+        ("Количество", lambda p: str(p.quantity), lambda p: p.quantity),
+        ("Минимум", lambda p: str(p.min_stock), lambda p: p.min_stock),
+        ("Статус", _product_status, _product_status),
+    ]
+
+
+class SalesTableModel(RowTableModel):
+    """История продаж"""
+    columns = [
+        ("ID", lambda s: str(s.id), lambda s: s.id),
+        ("Дата", lambda s: s.date.strftime("%d.%m.%Y %H:%M"), lambda s: s.date),
+        ("Товар", lambda s: s.product_name or "Неизвестно", lambda s: s.product_name),
+        ("Количество", lambda s: str(s.quantity), lambda s: s.quantity),
+        ("Сумма", lambda s: f"{s.total:.2f} ₽", lambda s: s.total),
+        ("Клиент", lambda s: s.customer_name or "—", lambda s: s.customer_name),
+    ]
+
+
+class SuppliesTableModel(RowTableModel):
+    """История поставок"""
+    columns = [
+        ("ID", lambda s: str(s.id), lambda s: s.id),
+        ("Дата", lambda s: s.date.strftime("%d.%m.%Y %H:%M"), lambda s: s.date),
+        ("Поставщик", lambda s: s.supplier, lambda s: s.supplier),
+        ("Товар", lambda s: s.product_name or "Неизвестно", lambda s: s.product_name),
+        ("Количество", lambda s: str(s.quantity), lambda s: s.quantity),
+        ("Стоимость", lambda s: f"{s.cost:.2f} ₽", lambda s: s.cost),
+    ]
+
+
+class CustomerTableModel(RowTableModel):
+    """Таблица клиентов"""
+    columns = [
+        ("ID", lambda c: str(c.id), lambda c: c.id),
+        ("Имя", lambda c: c.name, lambda c: c.name),
+        ("Телефон", lambda c: c.phone or "", lambda c: c.phone),
+        ("Email", lambda c: c.email or "—", lambda c: c.email),
+        ("Скидка", lambda c: f"{c.discount:.1f}%", lambda c: c.discount),
+    ]